@@ -14,35 +14,77 @@ def _linear_search_file(
     file: typing.BinaryIO,
     value: T,
     *,
+    start: int,
+    end: int,
     key: typing.Callable[[str], T],
     encoding: str,
 ) -> io.TextIOWrapper:
     """
     Helper function to `bisect_file_left`.  Performs a linear search through
-    the specified file stream as a fallback for when binary search is not
-    possible.
+    the lines in the interval `[start, end)` of the specified file stream as a
+    fallback for when binary search is not possible.
+
+    `start` and `end` must be the offsets of the starts of lines (or of the end
+    of the file).
     """
-    while True:
-        line_start = file.tell()
-        line = file.readline().decode(encoding=encoding)
-        if not line:
-            break
+    # This is called only after a midpoint probe ran past the end of the
+    # interval, which means that the second half of the interval holds no
+    # more than the remainder of a single line (plus any blank lines).  The
+    # interval therefore is at most about twice as long as that line, although
+    # its first half still might contain many short lines.  Read it with a
+    # single call and scan it in memory instead of reading it line by line.
+    file.seek(start, os.SEEK_SET)
+    data = file.read(end - start)
+
+    line_start = start
+    for raw_line in data.split(b"\n"):
+        line = raw_line.decode(encoding=encoding)
+        next_line_start = line_start + len(raw_line) + 1
 
         try:
             k = key(line)
         except ValueError as e:
             if not line.rstrip():
+                line_start = next_line_start
                 continue
             raise e from None
 
         # XXX: Ignore type checks until there's a built-in `Comparable` type.
         if value <= k:  # type: ignore
-            file.seek(line_start, os.SEEK_SET)
             break
+        line_start = next_line_start
 
+    file.seek(min(line_start, end), os.SEEK_SET)
     return io.TextIOWrapper(file, encoding=encoding)
 
 
+def _interpolate_offset(
+    value: T,
+    *,
+    start: int,
+    end: int,
+    start_key: T,
+    end_key: T,
+) -> typing.Optional[int]:
+    """
+    Helper function to `_bisect_file_left`.  Estimates the file offset in the
+    interval `[start, end)` where `value` would be found by linearly
+    interpolating between the keys at the ends of the interval.
+
+    Returns `None` if the keys do not support the necessary arithmetic (for
+    example, if they are strings) or if no estimate can be made.
+    """
+    try:
+        # XXX: Ignore type checks until there's a built-in `Comparable` type.
+        fraction = ((value - start_key)  # type: ignore
+                    / (end_key - start_key))  # type: ignore
+        if not 0 <= fraction < 1:
+            return None
+    except (TypeError, ArithmeticError):
+        return None
+    return start + int(fraction * (end - start))
+
+
 def _bisect_file_left(
     file: typing.BinaryIO,
     value: T,
@@ -51,8 +93,14 @@ def _bisect_file_left(
     encoding: str,
 ) -> io.TextIOWrapper:
     """
-    Helper function to `bisect_file_left`.  Performs a binary search through
-    the specified file stream.
+    Helper function to `bisect_file_left`.  Searches through the specified file
+    stream.
+
+    Keys in log files (e.g. timestamps) usually are roughly evenly distributed,
+    so once the keys at both ends of the search interval are known, the next
+    probe is chosen by interpolating between them.  Whenever an interpolated
+    probe fails to halve the interval, the next probe falls back to bisection
+    so that unevenly distributed keys cannot degrade the search to linear time.
     """
     file_length = file.seek(0, os.SEEK_END)
     if file_length == 0:
@@ -60,31 +108,40 @@ def _bisect_file_left(
 
     start = 0  # Inclusive.
     end = file_length  # Exclusive.
+    start_key: typing.Optional[T] = None
+    end_key: typing.Optional[T] = None
+    may_interpolate = True
     while True:
-        mid = (start + end) // 2
-
         if start == end:
             # Empty interval.
             break
 
-        file.seek(mid, os.SEEK_SET)
+        mid = None
+        if may_interpolate and start_key is not None and end_key is not None:
+            mid = _interpolate_offset(value, start=start, end=end,
+                                      start_key=start_key, end_key=end_key)
+        interpolated = mid is not None
+        if mid is None:
+            mid = (start + end) // 2
+        old_length = end - start
+
+        # Track the stream position ourselves instead of calling
+        # `file.tell()` after every read.
+        pos = file.seek(mid, os.SEEK_SET)
 
         # The seek position might be in the middle of a line; discard
         # the incomplete portion so that we can read the next line
         # whole.
-        file.readline()
+        pos += len(file.readline())
 
         while True:
-            mid = file.tell()
-            if file.tell() < end:
-                line = file.readline().decode(encoding=encoding)
-            else:
-                # We read the (possibly incomplete) last line in the interval.
-                # We can't tell if `mid` started in the middle of a line or
-                # not, so read lines sequentially from the start, which is
-                # expected to always be the start of a line.
-                file.seek(start, os.SEEK_SET)
-                return _linear_search_file(file, value, key=key, encoding=encoding)
+            mid = pos
+            if mid >= end:
+                break
+
+            raw_line = file.readline()
+            pos += len(raw_line)
+            line = raw_line.decode(encoding=encoding)
 
             try:
                 k = key(line)
@@ -94,14 +151,35 @@ def _bisect_file_left(
                     continue
                 raise e from None
 
+        if mid >= end:
+            if interpolated:
+                # An interpolated probe can land in the last line of an
+                # arbitrarily large interval.  Retry with the midpoint instead
+                # of scanning the whole interval.
+                may_interpolate = False
+                continue
+
+            # We read the (possibly incomplete) last line in the interval.  We
+            # can't tell if `mid` started in the middle of a line or not, so
+            # read lines sequentially from the start, which is expected to
+            # always be the start of a line.  Since `mid` was the midpoint,
+            # the interval is at most about twice as long as the line
+            # containing it.
+            return _linear_search_file(file, value, start=start, end=end,
+                                       key=key, encoding=encoding)
+
         # XXX: Ignore type checks until there's a built-in `Comparable` type.
         if value < k:  # type: ignore
             end = mid
+            end_key = k
         elif value > k:  # type: ignore
             start = mid
+            start_key = k
         else:
             break
 
+        may_interpolate = not interpolated or (end - start) <= old_length // 2
+
     file.seek(mid, os.SEEK_SET)
     return io.TextIOWrapper(file, encoding=encoding)
 
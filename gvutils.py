@@ -21,13 +21,12 @@ scripts.
 """
 
 import argparse
-import collections
-import configparser
 import dataclasses
 import datetime
 import enum
 import functools
 import io
+import itertools
 import os
 import re
 import sys
@@ -36,51 +35,10 @@ import typing
 import bisect_file
 
 
-bluetooth_address_re = re.compile(r"(?:[A-Fa-f0-9]{2}:){5}[A-Fa-f0-9]{2}")
-
-whitespace_re = re.compile(r"\s+")
-
-temperature_re = re.compile(r"(?P<degrees>[^\s]+)\s*(?P<units>[CF])")
+temperature_re = re.compile(r"(?P<degrees>[^\s]+)\s*(?P<units>[CFcf])")
 
 percentage_re = re.compile(r"(?P<percentage>\d+)%?")
 
-map_file_re = re.compile("".join(
-    (r"(?P<address>",
-     bluetooth_address_re.pattern,
-     r")",
-     r"(?:\s+(?P<name>.*))?\s*"),
-))
-
-log_filename_re = re.compile(r"(?P<base>"
-                             r"gv[A-Za-z0-9]+_"
-                             r"(?P<address>[A-Fa-f0-9]{12})-"
-                             r")"
-                             r"(?P<year>[0-9]{4})-(?P<month>[0-9]{2})"
-                             r"\.txt")
-
-log_line_re = re.compile(r"^"
-                         r"(?P<timestamp>\d{4}-\d{2}-\d{2}"
-                         r"\s+"
-                         r"\d{2}:\d{2}:\d{2}"
-                         r")"
-                         r"\s+"
-                         r"(?P<centigrade>[^\s]+)"
-                         r"\s+"
-                         r"(?P<humidity>\d+[.]?\d*)"
-                         r"\s+"
-                         r"(?P<battery>\d+)"
-                         r"(?:"
-                         r"\s+"
-                         r"(?P<model>[^\s]+)"
-                         r"\s+"
-                         r"(?P<centigrade2>[^\s]+)"
-                         r"\s+"
-                         r"(?P<centigrade3>[^\s]+)"
-                         r"\s+"
-                         r"(?P<centigrade4>[^\s]+)"
-                         r")?")
-
-
 T = typing.TypeVar("T")
 
 
@@ -170,14 +128,19 @@ def wrap_parse_arg(
     return wrapper
 
 
+_bool_values = {
+    **dict.fromkeys(("1", "true", "yes", "y", "on"), True),
+    **dict.fromkeys(("0", "false", "no", "n", "off"), False),
+}
+
+
 def parse_bool(s: str) -> bool:
     """Parses a boolean value from a string."""
     s = s.lower()
-    if s in ("1", "true", "yes", "y", "on"):
-        return True
-    elif s in ("0", "false", "no", "n", "off"):
-        return False
-    raise ValueError(f"Invalid boolean value: {s}")
+    value = _bool_values.get(s)
+    if value is None:
+        raise ValueError(f"Invalid boolean value: {s}")
+    return value
 
 
 def parse_percentage(s: str) -> int:
@@ -190,6 +153,9 @@ def parse_percentage(s: str) -> int:
 
 class DeviceConfig:
     """Configuration for a Govee thermometer device."""
+    __slots__ = ("address", "name", "expected_temperatures",
+                 "expected_humidities", "min_battery")
+
     def __init__(
         self,
         *,
@@ -223,8 +189,7 @@ class Config:
         If no path is specified, uses the default configuration file path.
         """
         self.log_directory = ""
-        self.devices: typing.OrderedDict[str, DeviceConfig] = \
-            collections.OrderedDict()
+        self.devices: typing.Dict[str, DeviceConfig] = {}
         self.ignored_addresses : typing.Set[str] = set()
 
         self.default_expected_temperatures: Range[Temperature] = \
@@ -244,16 +209,27 @@ class Config:
                 return
 
         with open(self.config_file_path, encoding="utf-8") as f:
-            # Try to parse the config file first as GoveeBTTempLogger's
-            # `gvh-titlemap.txt` format.
-            device_configs = parse_map_file(f)
-            if device_configs is not None:
-                self.devices = device_configs
-                return
+            # `.ini`-like files start with a section header or a comment,
+            # neither of which can start a `gvh-titlemap.txt` line, so don't
+            # bother trying the map file format for them.
+            first_line = next((line for line in f if line.strip()), "")
+            f.seek(0)
+            if not first_line.lstrip().startswith(("[", "#", ";")):
+                # Try to parse the config file as GoveeBTTempLogger's
+                # `gvh-titlemap.txt` format.
+                device_configs = parse_map_file(f)
+                if device_configs is not None:
+                    self.devices = device_configs
+                    return
+                f.seek(0)
 
             # Try to parse the config file as an `.ini`-like file.
+            #
+            # `configparser` is imported only here so that using a
+            # `gvh-titlemap.txt` file doesn't pay for importing it.
+            import configparser  # pylint: disable=import-outside-toplevel
+
             self.devices.clear()
-            f.seek(0)
             cp = configparser.ConfigParser(interpolation=None)
             try:
                 cp.read_file(f, source=self.config_file_path)
@@ -262,14 +238,14 @@ class Config:
                                  f"configuration file.") from e
 
         def parse_entry(
-            section: str,
+            section: configparser.SectionProxy,
             key: str,
             parse_value: typing.Callable[[str], T],
             *,
             default: typing.Optional[T] = None,
         ) -> typing.Optional[T]:
             try:
-                value = cp[section].get(key)
+                value = section.get(key)
                 if value is None:
                     return default
 
@@ -278,7 +254,8 @@ class Config:
                     return None
                 return parse_value(value)
             except ValueError as e:
-                raise AbortError(f"{e} (for `{key}` in section [{section}] in "
+                raise AbortError(f"{e} (for `{key}` in section "
+                                 f"[{section.name}] in "
                                  f"{self.config_file_path})") from e
 
         # For backward compatibility with the old section name.
@@ -301,47 +278,47 @@ class Config:
                     raise AbortError(f"Failed to parse {map_file}: "
                                      f"{e.strerror}") from e
                 with f:
-                    self.devices = (parse_map_file(f)
-                                    or collections.OrderedDict())
+                    self.devices = parse_map_file(f) or {}
 
             self.default_expected_temperatures.lower = parse_entry(
-                common_section_name,
+                common_section,
                 "min_temperature",
                 Temperature.parse,
             )
             self.default_expected_temperatures.upper = parse_entry(
-                common_section_name,
+                common_section,
                 "max_temperature",
                 Temperature.parse,
             )
             self.default_expected_humidities.lower = parse_entry(
-                common_section_name,
+                common_section,
                 "min_humidity",
                 parse_percentage,
             )
             self.default_expected_humidities.upper = parse_entry(
-                common_section_name,
+                common_section,
                 "max_humidity",
                 parse_percentage,
             )
-            self.default_min_battery = parse_entry(common_section_name,
+            self.default_min_battery = parse_entry(common_section,
                                                    "min_battery",
                                                    parse_percentage)
 
         if cp.has_section("notify"):
             self.notify_command = cp["notify"].get("command")
 
-        for section_name in cp:
-            if not bluetooth_address_re.fullmatch(section_name):
+        for section_name in cp.sections():
+            if not is_bluetooth_address(section_name):
                 continue
 
             address = section_name
+            section = cp[section_name]
 
-            if parse_entry(section_name, "ignore", parse_bool):
+            if parse_entry(section, "ignore", parse_bool):
                 self.ignored_addresses.add(address)
                 continue
 
-            name = cp[section_name].get("name")
+            name = section.get("name")
 
             # Device names from the map file take precedence.
             device = self.devices.setdefault(address,
@@ -349,33 +326,33 @@ class Config:
                                                           name=name))
 
             device.expected_temperatures.lower = parse_entry(
-                section_name,
+                section,
                 "min_temperature",
                 Temperature.parse,
                 default=self.default_expected_temperatures.lower,
             )
             device.expected_temperatures.upper = parse_entry(
-                section_name,
+                section,
                 "max_temperature",
                 Temperature.parse,
                 default=self.default_expected_temperatures.upper,
             )
 
             device.expected_humidities.lower = parse_entry(
-                section_name,
+                section,
                 "min_humidity",
                 parse_percentage,
                 default=self.default_expected_humidities.lower,
             )
             device.expected_humidities.upper = parse_entry(
-                section_name,
+                section,
                 "max_humidity",
                 parse_percentage,
                 default=self.default_expected_humidities.upper,
             )
 
             device.min_battery = parse_entry(
-                section_name,
+                section,
                 "min_battery",
                 parse_percentage,
                 default=self.default_min_battery,
@@ -384,7 +361,7 @@ class Config:
 
 def parse_map_file(
     file: typing.TextIO,
-) -> typing.Optional[typing.OrderedDict[str, DeviceConfig]]:
+) -> typing.Optional[typing.Dict[str, DeviceConfig]]:
     """
     Tries to parse the specified file stream as GoveeBTTempLogger's
     `gvh-titlemap.txt` format, which consists of lines of the form:
@@ -395,19 +372,20 @@ def parse_map_file(
 
     Returns `None` on parsing failure.
     """
-    device_configs: typing.OrderedDict[str, DeviceConfig] = \
-        collections.OrderedDict()
+    device_configs: typing.Dict[str, DeviceConfig] = {}
 
+    # Iterate lazily so that a file in some other format is rejected at its
+    # first line.
     for line in file:
-        if whitespace_re.fullmatch(line):
+        line = line.rstrip("\n")
+        if not line.strip():
             continue
 
-        m = map_file_re.fullmatch(line)
-        if not m:
+        address, *rest = line.split(None, 1)
+        if not is_bluetooth_address(address):
             return None
-        name = m.group("name")
-        address = m.group("address")
-        if name and address:
+        name = rest[0] if rest else None
+        if name:
             device_configs[address] = DeviceConfig(address=address, name=name)
 
     return device_configs
@@ -418,6 +396,8 @@ LogTable = typing.Dict[typing.Tuple[int, int], typing.Dict[str, str]]
 
 def generate_log_lookup_table(
     log_directory: str,
+    *,
+    year_month: typing.Optional[typing.Tuple[int, int]] = None,
 ) -> LogTable:
     """
     Scans the specified directory for GoveeBTTempLogger log files and returns a
@@ -427,34 +407,104 @@ def generate_log_lookup_table(
     ```
     (2022, 7): {'01:23:45:67:89:AB': 'gvh507x_0123456789AB-2022-07.txt'}
     ```
+
+    If `year_month` is specified, only log files for that `(year, month)` are
+    included.
     """
+    suffix = ""
+    if year_month:
+        (year, month) = year_month
+        suffix = f"-{year:04}-{month:02}.txt"
+
     log_table: LogTable = {}
     with os.scandir(log_directory) as dir_entries:
         for entry in dir_entries:
-            if not entry.is_file():
-                continue
-            match = log_filename_re.fullmatch(entry.name)
-            if not match:
+            # Cheaply skip logs for other months.
+            if not entry.name.endswith(suffix):
                 continue
 
-            address = chunk_address(match.group("address"))
-            year = int(match.group("year"))
-            month = int(match.group("month"))
+            # Check the name before the file type; checking the type might
+            # require a `stat` call.
+            parsed = parse_log_filename(entry.name)
+            if not parsed or not entry.is_file():
+                continue
 
+            (address, year, month) = parsed
             log_table.setdefault((year, month), {})[address] = entry.name
 
     return log_table
 
 
+_hex_digits = frozenset("0123456789ABCDEFabcdef")
+_decimal_digits = frozenset("0123456789")
+
+# A `str.translate` table that deletes hexadecimal digits.
+_delete_hex_digits = str.maketrans("", "", "".join(_hex_digits))
+
+
+def is_bluetooth_address(s: str) -> bool:
+    """
+    Returns `True` if the specified string is a Bluetooth address of the form
+    `01:23:45:67:89:AB`, `False` otherwise.
+    """
+    # Once the separators are known to be in the right places, deleting all
+    # hexadecimal digits must leave only the separators behind.
+    return (len(s) == 17
+            and s[2::3] == ":::::"
+            and s.translate(_delete_hex_digits) == ":::::")
+
+
+def parse_log_filename(
+    name: str,
+) -> typing.Optional[typing.Tuple[str, int, int]]:
+    """
+    Parses the name of a GoveeBTTempLogger log file, which is of the form:
+
+    ```
+    gvMODEL_0123456789AB-YEAR-MONTH.txt
+    ```
+
+    Returns a `tuple` of `(address, year, month)`, or `None` if the name is not
+    that of a log file.
+    """
+    # The format is rigid enough that slicing from the end of the name is much
+    # cheaper than matching a regular expression against every directory
+    # entry.
+    if (len(name) < 28
+            or not name.startswith("gv")
+            or not name.endswith(".txt")
+            or name[-25] != "_"
+            or name[-12] != "-"
+            or name[-7] != "-"):
+        return None
+
+    model = name[2:-25]
+    address = name[-24:-12]
+    year = name[-11:-7]
+    month = name[-6:-4]
+    if (not (model.isascii() and model.isalnum())
+            or not _hex_digits.issuperset(address)
+            or not _decimal_digits.issuperset(year)
+            or not _decimal_digits.issuperset(month)):
+        return None
+
+    return (chunk_address(address), int(year), int(month))
+
+
 def chunk_address(address: str) -> str:
     """Inserts `:` separators between each octet of a Bluetooth address."""
     assert len(address) == 12
-    return ":".join((address[i : (i + 2)] for i in range(0, len(address), 2)))
+    return (f"{address[0:2]}:{address[2:4]}:{address[4:6]}:"
+            f"{address[6:8]}:{address[8:10]}:{address[10:12]}")
 
 
 @dataclasses.dataclass
 class LogLine:
     """Stores data parsed from a line of a GoveeBTTempLogger log file."""
+    # Declared manually because `dataclass(slots=True)` requires Python 3.10.
+    # This works only because none of the fields have default values.
+    __slots__ = ("timestamp", "centigrades", "humidity", "battery")
+
     timestamp: datetime.datetime
     centigrades: typing.List[float]
     humidity: float
@@ -465,25 +515,52 @@ class LogLine:
         """
         Returns a `LogLine` object parsed from a single line of a
         GoveeBTTempLogger log file.
+
+        Log lines consist of whitespace-separated columns of the form:
+
+        ```
+        DATE TIME CENTIGRADE HUMIDITY BATTERY [MODEL CENTIGRADE CENTIGRADE CENTIGRADE]
+        ```
         """
-        match = log_line_re.match(line)
-        if not match:
+        # Lines may not start with whitespace, and the date and time must be
+        # separated by a single character.
+        parts = line.split()
+        if (len(parts) < 5
+                or line[0].isspace()
+                or line[11:11 + len(parts[1])] != parts[1]):
             raise ValueError(f"Failed to parse log line: {line}")
 
-        timestamp = \
-            (datetime.datetime.fromisoformat(match.group("timestamp"))
-             .replace(tzinfo=datetime.timezone.utc))
+        # Humidities must be non-negative decimal numbers (e.g. `50`, `50.`,
+        # `50.5`), not anything that `float` would accept.
+        (humidity_whole, _, humidity_fraction) = parts[3].partition(".")
+        if (not humidity_whole.isdecimal()
+                or (humidity_fraction and not humidity_fraction.isdecimal())):
+            raise ValueError(f"Failed to parse log line: {line}")
 
-        centigrades = [
-            float(match.group("centigrade")),
-            *(float(s)
-              for s in (match.group(f"centigrade{i}")
-                        for i in range(2, 5))
-              if s),
-        ]
+        # Only the leading digits of the battery column are significant.
+        # Trailing junk (e.g. `88x`) is tolerated but then prevents the
+        # extra temperature columns from being recognized.
+        battery_column = parts[4]
+        has_extra_columns = len(parts) >= 9
+        if not battery_column.isdecimal():
+            battery_column = "".join(
+                itertools.takewhile(str.isdecimal, battery_column),
+            )
+            if not battery_column:
+                raise ValueError(f"Failed to parse log line: {line}")
+            has_extra_columns = False
 
-        humidity = float(match.group("humidity"))
-        battery = int(match.group("battery"))
+        try:
+            timestamp = parse_log_timestamp(parts[0], parts[1])
+
+            centigrades = [float(parts[2])]
+            if has_extra_columns:
+                centigrades += (float(s) for s in parts[6:9])
+
+            humidity = float(parts[3])
+            battery = int(battery_column)
+        except ValueError as e:
+            raise ValueError(f"Failed to parse log line: {line}") from e
 
         return LogLine(timestamp=timestamp,
                        centigrades=centigrades,
@@ -491,6 +568,23 @@ class LogLine:
                        battery=battery)
 
 
+def parse_log_timestamp(date: str, time: str) -> datetime.datetime:
+    """
+    Returns a UTC `datetime.datetime` parsed from the date and time columns of
+    a GoveeBTTempLogger log line.
+
+    Raises `ValueError` if the columns do not form a valid timestamp.
+    """
+    if (len(date) != 10 or len(time) != 8
+            or date[4] != "-" or date[7] != "-"
+            or time[2] != ":" or time[5] != ":"):
+        raise ValueError(f"Invalid timestamp: {date} {time}")
+
+    # Parsing an explicit UTC offset is much cheaper than constructing a naive
+    # `datetime` and then `replace`-ing its `tzinfo`.
+    return datetime.datetime.fromisoformat(f"{date} {time}+00:00")
+
+
 def parse_log_lines(
     log_path: str,
     after: typing.Optional[datetime.datetime] = None,
@@ -501,26 +595,73 @@ def parse_log_lines(
     on or after that time.
     """
     def get_timestamp(line: str) -> datetime.datetime:
-        match = log_line_re.match(line)
-        if not match:
+        parts = line.split(None, 2)
+        if len(parts) < 2:
             raise ValueError(f"Failed to parse log line: {line}")
-        return (datetime.datetime.fromisoformat(match.group("timestamp"))
-                .replace(tzinfo=datetime.timezone.utc))
+        return parse_log_timestamp(parts[0], parts[1])
 
     with typing.cast(
         io.TextIOWrapper,
         bisect_file.bisect_file_left(log_path, after, key=get_timestamp),
     ) if after else open(log_path, encoding="utf-8") as f:
-        for line in f:
+        # Read the (remainder of the) log in a single call and split it in
+        # memory rather than going through the text layer for each line.
+        # Even a month of logs comfortably fits in memory.
+        #
+        # Universal newline translation already normalizes line endings to
+        # `\n`.  Don't use `splitlines`, which also would split on characters
+        # such as `\f` and `\x1c` that instead should separate columns.
+        for line in f.read().split("\n"):
             line = line.rstrip()
             if not line:
                 continue
             yield LogLine.parse(line)
 
 
+def parse_last_log_lines(
+    log_path: str,
+    count: int,
+) -> typing.Generator[LogLine, None, None]:
+    """
+    A generator that yields a `LogLine` for each of the last `count` lines in
+    the file specified by `log_path`.
+
+    The file is read backwards from its end, so only the tail of the file is
+    read regardless of the size of the log.
+    """
+    if count <= 0:
+        return
+
+    with open(log_path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        read_size = io.DEFAULT_BUFFER_SIZE
+        while True:
+            lines = data.splitlines()
+
+            # Unless we've reached the start of the file, the first line might
+            # be incomplete.
+            if position > 0:
+                lines = lines[1:]
+            lines = [line for line in lines if line.strip()]
+
+            if len(lines) >= count or position == 0:
+                break
+
+            # Read progressively larger blocks so that the total amount of work
+            # stays proportional to the amount read.
+            read_size = min(read_size * 2, position)
+            position -= read_size
+            f.seek(position, os.SEEK_SET)
+            data = f.read(read_size) + data
+
+    for line in lines[-count:]:
+        yield LogLine.parse(line.decode("utf-8").rstrip())
+
+
 def fahrenheit_from_centigrade(degrees_c: float) -> float:
     """Converts a temperature from degrees centigrade to degrees Fahrenheit."""
-    return degrees_c * 9 / 5 + 32
+    return degrees_c * 1.8 + 32
 
 
 def centigrade_from_fahrenheit(degrees_f: float) -> float:
@@ -537,6 +678,8 @@ class TemperatureUnit(enum.Enum):
 @functools.total_ordering
 class Temperature:
     """A class to represent temperatures."""
+    __slots__ = ("degrees_c", "preferred_unit")
+
     def __init__(
         self,
         *,
@@ -563,14 +706,14 @@ class Temperature:
         ```
         Accepted units are `"C"` and `"F"`.  Case is ignored.
         """
-        match = temperature_re.fullmatch(s.upper())
+        match = temperature_re.fullmatch(s)
         if not match:
             raise ValueError(f"Invalid temperature: {s}")
         try:
             degrees = float(match.group("degrees"))
         except ValueError as e:
             raise ValueError(f"Invalid temperature: {s}") from e
-        units = match.group("units")
+        units = match.group("units").upper()
         preferred_unit = TemperatureUnit.CENTIGRADE
         if units == "F":
             degrees = centigrade_from_fahrenheit(degrees)
@@ -585,7 +728,7 @@ class Temperature:
         return self.degrees_c < other.degrees_c
 
     def __str__(self) -> str:
-        if self.preferred_unit == TemperatureUnit.CENTIGRADE:
+        if self.preferred_unit is TemperatureUnit.CENTIGRADE:
             return f"{self.degrees_c:.2f}C"
         else:
             return f"{fahrenheit_from_centigrade(self.degrees_c):.2f}F"